@@ -0,0 +1,4 @@
+import time
+
+# Cold-start reference point: taken before app.main and its dependencies are imported.
+STARTED = time.perf_counter()
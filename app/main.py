@@ -1,36 +1,43 @@
 import os
+import time
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from dotenv import load_dotenv
 
-from .db import engine, Base
+from .db import engine
 from .api import router as api_router
 from .telegram_bot import router as tg_router
+from .migrations import run_migrations
+from . import STARTED
 
-load_dotenv()
-
+log = logging.getLogger("uvicorn.error")
 
-from sqlalchemy import text
+# Interpreter and uvicorn boot happen before the app package is imported and are not counted.
+_imports_ms = round((time.perf_counter() - STARTED) * 1000, 1)
+log.info("Startup: app imports took %.1f ms", _imports_ms)
 
-def _auto_migrate():
-    """
-    Tiny safety migration for MVP:
-    Telegram user ids can exceed 32-bit int. If the DB was created earlier with INTEGER,
-    we upgrade users.telegram_id to BIGINT.
-    """
-    try:
-        with engine.begin() as conn:
-            # Works in Postgres; no-op / safe to fail in SQLite.
-            conn.execute(text("ALTER TABLE users ALTER COLUMN telegram_id TYPE BIGINT"))
-    except Exception:
-        pass
+load_dotenv()
 
-app = FastAPI(title="Telegram Planner MVP")
 
-# Create tables on startup (MVP). For production, replace with Alembic migrations.
-Base.metadata.create_all(bind=engine)
-_auto_migrate()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Versioned migrations: a single version check when the schema is already current.
+    started = time.perf_counter()
+    applied = run_migrations(engine)
+    now = time.perf_counter()
+    app.state.startup_ms = {
+        "imports": _imports_ms,
+        "migrations": round((now - started) * 1000, 1),
+        "total": round((now - STARTED) * 1000, 1),
+    }
+    log.info("Startup: %d migration(s) applied in %.1f ms", applied, app.state.startup_ms["migrations"])
+    log.info("Startup: ready %.1f ms after app package import", app.state.startup_ms["total"])
+    yield
+
+app = FastAPI(title="Telegram Planner MVP", lifespan=lifespan)
 
 app.include_router(api_router)
 app.include_router(tg_router)
@@ -0,0 +1,249 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import (
+    MetaData, Table, Column, ForeignKey,
+    String, Integer, BigInteger, DateTime, Date, Boolean, Text,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+# uvicorn configures this logger before importing the app, so messages show up in deploy logs.
+log = logging.getLogger("uvicorn.error")
+
+# Arbitrary app-wide key for pg_advisory_lock, shared by every worker/replica.
+ADVISORY_LOCK_KEY = 72_311_026
+LOCK_POLL_INTERVAL = 0.2  # seconds
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+    # CREATE INDEX CONCURRENTLY and friends can't run inside a transaction block.
+    transactional: bool = True
+
+
+def _is_postgres(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+def create_index_concurrently(conn: Connection, name: str, table: str, columns: str):
+    """
+    Online-safe index creation: on Postgres uses CONCURRENTLY, so writes to `table`
+    are not blocked while the index builds. A failed concurrent build leaves an INVALID
+    index behind, which is dropped first so the migration can be retried.
+    Must be used from a non-transactional migration.
+    """
+    if not _is_postgres(conn):
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+        return
+
+    invalid = conn.execute(text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+# --- Migrations (append only, never renumber, never edit an applied one) ---
+#
+# The schema as of v1 is frozen below rather than taken from app.models: create_all on
+# the current models would already contain every later change, and migrations that
+# add columns/indexes would then fail on fresh databases.
+
+_v1 = MetaData()
+
+Table(
+    "users", _v1,
+    Column("id", Integer, primary_key=True),
+    Column("telegram_id", BigInteger, nullable=False, unique=True, index=True),
+    Column("first_name", String(120), nullable=True),
+    Column("username", String(120), nullable=True),
+    Column("timezone", String(64), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+
+Table(
+    "projects", _v1,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("name", String(120), nullable=False),
+    Column("color", String(16), nullable=False),
+)
+
+Table(
+    "tasks", _v1,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("title", String(240), nullable=False),
+    Column("notes", Text, nullable=True),
+    Column("status", String(32), nullable=False),
+    Column("priority", Integer, nullable=False),
+    Column("due_date", Date, nullable=True),
+    Column("estimate_min", Integer, nullable=False),
+    Column("project_id", Integer, ForeignKey("projects.id", ondelete="SET NULL"), nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+Table(
+    "events", _v1,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("title", String(240), nullable=False),
+    Column("start_dt", DateTime, nullable=False, index=True),
+    Column("end_dt", DateTime, nullable=False, index=True),
+    Column("color", String(16), nullable=False),
+    Column("source", String(32), nullable=False),
+    Column("task_id", Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True),
+    Column("is_deleted", Boolean, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+
+
+def _m1_baseline(conn: Connection):
+    # Creates any missing tables; existing ones (DBs from before versioning) are left as is.
+    _v1.create_all(bind=conn)
+
+
+def _m2_telegram_id_bigint(conn: Connection):
+    """
+    Telegram user ids can exceed 32-bit int. DBs created before the model fix have
+    users.telegram_id as INTEGER. Only ALTER when needed: it takes an ACCESS EXCLUSIVE lock.
+    """
+    if not _is_postgres(conn):
+        return  # SQLite integers are 64-bit already
+    data_type = conn.execute(text(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'users' AND column_name = 'telegram_id'"
+    )).scalar()
+    if data_type and data_type != "bigint":
+        conn.execute(text("ALTER TABLE users ALTER COLUMN telegram_id TYPE BIGINT"))
+
+
+def _m3_events_user_start_idx(conn: Connection):
+    # Backs the per-user day/range queries on events (user_id = ? AND start_dt in range).
+    create_index_concurrently(conn, "ix_events_user_start", "events", "user_id, start_dt")
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline", _m1_baseline),
+    Migration(2, "users.telegram_id bigint", _m2_telegram_id_bigint),
+    Migration(3, "events (user_id, start_dt) index", _m3_events_user_start_idx, transactional=False),
+]
+
+
+# --- Runner ---
+
+def _is_missing_table(exc: DBAPIError) -> bool:
+    # Postgres: undefined_table (psycopg 3 exposes .sqlstate, psycopg2 .pgcode). SQLite has no codes.
+    code = getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
+    return code == "42P01" or "no such table" in str(exc.orig)
+
+
+def _current_version(conn: Connection) -> int:
+    """
+    One round trip in every case. A has_table() probe would add a catalog query to each
+    boot, and a to_regclass() guard can't be folded into the same statement because
+    Postgres resolves the table name while parsing it. Only "table does not exist" means
+    an unversioned DB; any other error propagates.
+    """
+    try:
+        return conn.execute(text("SELECT MAX(version) FROM schema_migrations")).scalar() or 0
+    except DBAPIError as e:
+        if not _is_missing_table(e):
+            raise
+        conn.rollback()
+        return 0
+
+
+def _ensure_version_table(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, "
+            "name VARCHAR(200) NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        ))
+
+
+def _record(conn: Connection, m: Migration):
+    conn.execute(
+        text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n) ON CONFLICT (version) DO NOTHING"),
+        {"v": m.version, "n": m.name},
+    )
+
+
+def _apply(engine: Engine, m: Migration):
+    if m.transactional:
+        with engine.begin() as conn:
+            m.apply(conn)
+            _record(conn, m)
+        return
+
+    with engine.connect() as conn:
+        autocommit = conn.execution_options(isolation_level="AUTOCOMMIT")
+        m.apply(autocommit)
+        _record(autocommit, m)
+
+
+def _acquire_advisory_lock(lock_conn: Connection):
+    """
+    Poll pg_try_advisory_lock instead of blocking in pg_advisory_lock: a waiting
+    statement holds a snapshot, and CREATE INDEX CONCURRENTLY in the migrating worker
+    waits for all older snapshots — an undetectable deadlock across processes.
+    `lock_conn` must be in AUTOCOMMIT so nothing is held between polls.
+    """
+    waiting = False
+    while not lock_conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": ADVISORY_LOCK_KEY}).scalar():
+        if not waiting:
+            log.info("Waiting for another worker to finish migrations")
+            waiting = True
+        time.sleep(LOCK_POLL_INTERVAL)
+
+
+def run_migrations(engine: Engine) -> int:
+    """
+    Bring the schema up to the latest version in MIGRATIONS. Returns the number of
+    migrations applied.
+
+    When the schema is current this is a single SELECT on every backend. Otherwise, on Postgres, an
+    advisory lock makes concurrently starting workers wait while one of them migrates;
+    the others then re-check the version and find nothing to do.
+
+    SQLite (local dev) has no such lock: start a single worker against a fresh dev.db.
+    """
+    latest = MIGRATIONS[-1].version
+    with engine.connect() as conn:
+        if _current_version(conn) >= latest:
+            return 0
+
+    with engine.connect() as conn:
+        lock_conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        pg = _is_postgres(lock_conn)
+        if pg:
+            _acquire_advisory_lock(lock_conn)
+        try:
+            _ensure_version_table(engine)
+            with engine.connect() as c:
+                current = _current_version(c)
+
+            pending = [m for m in MIGRATIONS if m.version > current]
+            for m in pending:
+                started = time.perf_counter()
+                _apply(engine, m)
+                log.info(
+                    "Applied migration %d (%s) in %.1f ms",
+                    m.version, m.name, (time.perf_counter() - started) * 1000,
+                )
+            return len(pending)
+        finally:
+            if pg:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": ADVISORY_LOCK_KEY})
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from app import migrations, models
+from app.db import Base
+from app.migrations import Migration, run_migrations
+
+
+@pytest.fixture
+def engine(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield eng
+    eng.dispose()
+
+
+def _versions(engine):
+    with engine.connect() as conn:
+        return [r[0] for r in conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+
+
+def _indexes(engine, table):
+    # Pooled SQLite connections can answer PRAGMA index_list from a stale schema cache.
+    engine.dispose()
+    return {ix["name"] for ix in inspect(engine).get_indexes(table)}
+
+
+def test_empty_database_is_migrated_to_latest(engine):
+    assert run_migrations(engine) == len(migrations.MIGRATIONS)
+    assert _versions(engine) == [m.version for m in migrations.MIGRATIONS]
+
+    insp = inspect(engine)
+    assert {"users", "projects", "tasks", "events"} <= set(insp.get_table_names())
+    assert "ix_events_user_start" in _indexes(engine, "events")
+
+
+def test_migrated_schema_matches_models(engine):
+    run_migrations(engine)
+    insp = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        assert {c["name"] for c in insp.get_columns(table.name)} == set(table.columns.keys())
+        assert {ix.name for ix in table.indexes} <= _indexes(engine, table.name)
+
+
+def test_current_schema_costs_one_select(engine):
+    run_migrations(engine)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cur, stmt, *a: statements.append(stmt))
+    assert run_migrations(engine) == 0
+    assert statements == ["SELECT MAX(version) FROM schema_migrations"]
+
+
+def test_version_check_errors_other_than_missing_table_propagate(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE schema_migrations (name VARCHAR(200))"))
+    with pytest.raises(OperationalError, match="no such column"):
+        run_migrations(engine)
+
+
+def test_pre_versioning_database_is_upgraded(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, telegram_id INTEGER NOT NULL, "
+            "first_name VARCHAR(120), username VARCHAR(120), timezone VARCHAR(64) NOT NULL, "
+            "created_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text(
+            "INSERT INTO users (telegram_id, timezone, created_at) VALUES (5000000000, 'UTC', '2024-01-01')"
+        ))
+
+    assert run_migrations(engine) == len(migrations.MIGRATIONS)
+    assert _versions(engine) == [m.version for m in migrations.MIGRATIONS]
+    assert {"projects", "tasks", "events"} <= set(inspect(engine).get_table_names())
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT telegram_id FROM users")).scalar() == 5000000000
+
+
+def test_non_transactional_migration_is_recorded(engine, monkeypatch):
+    run_migrations(engine)
+    extra = Migration(
+        migrations.MIGRATIONS[-1].version + 1, "extra index",
+        lambda conn: migrations.create_index_concurrently(conn, "ix_tasks_status", "tasks", "status"),
+        transactional=False,
+    )
+    monkeypatch.setattr(migrations, "MIGRATIONS", [*migrations.MIGRATIONS, extra])
+
+    assert run_migrations(engine) == 1
+    assert _versions(engine)[-1] == extra.version
+    assert "ix_tasks_status" in _indexes(engine, "tasks")
+
+
+def test_record_is_idempotent(engine):
+    run_migrations(engine)
+    with engine.begin() as conn:
+        migrations._record(conn, migrations.MIGRATIONS[0])
+    assert _versions(engine) == [m.version for m in migrations.MIGRATIONS]
+
+
+def test_models_are_registered():
+    # Guards test_migrated_schema_matches_models against an empty metadata.
+    assert models.User.__table__ in Base.metadata.sorted_tables